@@ -1,61 +1,85 @@
-import os
+import hashlib
+import json
 import re
-from dotenv import load_dotenv
-from flask import Blueprint, Flask, jsonify
-import requests
-from googleapiclient.discovery import build
-from groq import Groq
-from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from cache import cache_get, cache_set
+from config import CSE_ID, GG_API_KEY
+from groq_client import get_client
+from http_session import get_json, session
 
 # Flask app
 app_bp = Blueprint('app_bp', __name__)
 
-# API keys
-load_dotenv(dotenv_path=".env")
-gg_api_key = os.getenv("GG_API_KEY")
-cse_id = os.getenv("CSE_ID")
-client = Groq(
-    api_key=os.getenv("GROQ_API_KEY_1"),
+# Compiled once; re.search(pattern, ...) would recompile on every request
+FINAL_DECISION_RE = re.compile(
+    r'"final_decision":\s*{\s*"token_name":\s*"([^"]+)",\s*"decision":\s*(true|false)'
 )
 
+client = get_client("GROQ_API_KEY_1")
+
 def fetch_memecoin_info():
     """Fetch information about popular memecoins from CoinGecko API."""
     memecoins = ["dogecoin", "shiba-inu", "pepe", "floki", "bonk"]
+    cached = cache_get("coingecko:memecoins")
+    if cached:
+        return cached
     memecoin_data = {}
 
-    for coin in memecoins:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin}"
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                memecoin_data[coin] = {
-                    "name": data["name"],
-                    "symbol": data["symbol"],
-                    "price": data["market_data"]["current_price"]["usd"],
-                    "volume": data["market_data"]["total_volume"]["usd"],
-                    "market_cap": data["market_data"]["market_cap"]["usd"],
-                    "price_change_24h": data["market_data"]["price_change_percentage_24h"],
-                }
-        except Exception as e:
-            print(f"Error fetching data for {coin}: {e}")
+    # /coins/markets returns every requested coin in one call, so this is a
+    # single round trip (and one rate-limit token) instead of five; get_json
+    # revalidates with the stored ETag so unchanged data costs a 304.
+    try:
+        for entry in get_json(
+            "https://api.coingecko.com/api/v3/coins/markets",
+            params={"vs_currency": "usd", "ids": ",".join(memecoins)},
+        ):
+            memecoin_data[entry["id"]] = {
+                "name": entry["name"],
+                "symbol": entry["symbol"],
+                "price": entry["current_price"],
+                "volume": entry["total_volume"],
+                "market_cap": entry["market_cap"],
+                "price_change_24h": entry["price_change_percentage_24h"],
+            }
+    except Exception as e:
+        print(f"Error fetching memecoin data: {e}")
+    if memecoin_data:
+        cache_set("coingecko:memecoins", memecoin_data, 60)
     return memecoin_data
 
 def search_trends():
     """Search for the latest trends using Google Custom Search API."""
-    service = build("customsearch", "v1", developerKey=gg_api_key)
+    cached = cache_get("cse:meme-trends")
+    if cached:
+        return cached
     try:
-        results = service.cse().list(q="latest meme trends cryptocurrency", cx=cse_id, num=5).execute()
-        return [
+        # Call the CSE REST endpoint directly; the discovery client rebuilt
+        # its service description on every request just to issue this GET.
+        response = session.get(
+            "https://www.googleapis.com/customsearch/v1",
+            params={"key": GG_API_KEY, "cx": CSE_ID, "q": "latest meme trends cryptocurrency", "num": 5},
+            timeout=10,
+        )
+        response.raise_for_status()
+        results = response.json()
+        trends = [
             {"title": item["title"], "link": item["link"], "snippet": item["snippet"]}
             for item in results.get("items", [])
         ]
+        if trends:
+            cache_set("cse:meme-trends", trends, 300)
+        return trends
     except Exception as e:
         print(f"Error fetching trends: {e}")
         return []
 
-def analyze_market(memecoin_data, trends):
-    """Analyze memecoin data and trends to make a decision."""
+def analyze_market(memecoin_data, trends, stream=False):
+    """Analyze memecoin data and trends to make a decision.
+
+    With stream=True, returns a generator of response-text chunks as the
+    model produces them instead of waiting for the full completion.
+    """
     prompt = f"""Analyze the following memecoin data and trends. Recommend the best coin to buy or sell.
     Memecoin Data: {memecoin_data}
     Trends: {trends}
@@ -69,32 +93,73 @@ def analyze_market(memecoin_data, trends):
       }}
     }}
     """
+    # Identical inputs (common while the upstream caches are warm) produce
+    # identical prompts, so reuse the previous completion instead of paying
+    # for a new one. Streaming responses are generated fresh.
+    cache_key = "llm:" + hashlib.sha256(prompt.encode()).hexdigest()
+    if not stream:
+        cached = cache_get(cache_key)
+        if cached:
+            return cached
     try:
         response = client.chat.completions.create(
             messages=[{"role": "user", "content": prompt}],
             model="llama3-70b-8192",
+            stream=stream,
         )
-        return response.choices[0].message.content
+        if stream:
+            return (chunk.choices[0].delta.content or "" for chunk in response)
+        content = response.choices[0].message.content
+        if content:
+            cache_set(cache_key, content, 300)
+        return content
     except Exception as e:
         print(f"Error analyzing market: {e}")
         return None
 
 
+def _parse_final_decision(analysis):
+    """Extract token_name and decision from the LLM output."""
+    text = analysis if analysis else ""
+    # The model is asked for JSON, so parse the outermost object properly
+    # instead of regex-matching it; fall back to the regex for sloppy output.
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            decision = json.loads(text[start:end + 1]).get("final_decision", {})
+            return str(decision.get("token_name", "None")), decision.get("decision") is True
+        except (ValueError, AttributeError):
+            pass
+    match = FINAL_DECISION_RE.search(text)
+    if match:
+        return match.group(1), match.group(2).lower() == 'true'
+    return "None", False
+
+
 @app_bp.route('/', methods=['GET'],strict_slashes=False)
 def main():
     """Main endpoint to get market analysis and recommendation."""
-    memecoin_data = fetch_memecoin_info()
-    trends = search_trends()
+    # Market data and trends are independent; fetch both at once. Only the
+    # LLM call has to wait for them.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        memecoin_future = executor.submit(fetch_memecoin_info)
+        trends_future = executor.submit(search_trends)
+        memecoin_data = memecoin_future.result()
+        trends = trends_future.result()
+
+    # ?stream=true streams the raw analysis text as the model generates it,
+    # so the client sees output immediately instead of after the whole
+    # completion finishes.
+    if request.args.get("stream") in ("1", "true"):
+        chunks = analyze_market(memecoin_data, trends, stream=True)
+        if chunks is not None:
+            return Response(stream_with_context(chunks), mimetype="text/plain")
+
     analysis = analyze_market(memecoin_data, trends)
 
     # Extract token_name and decision from analysis if provided
-    match = re.search(r'"final_decision":\s*{\s*"token_name":\s*"([^"]+)",\s*"decision":\s*(true|false)', analysis if analysis else "")
-    if match:
-        token_name = match.group(1)
-        decision = match.group(2).lower() == 'true'
-    else:
-        token_name = "None"
-        decision = False
+    token_name, decision = _parse_final_decision(analysis)
 
     # Trả về chỉ hai giá trị yêu cầu
     return jsonify({
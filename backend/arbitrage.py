@@ -1,36 +1,60 @@
-import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import ccxt
-from dotenv import load_dotenv
 from flask import Blueprint, jsonify
-from flask_cors import CORS
-from groq import Groq  # Thư viện Groq cho AI phân tích
+from cache import cache_get, cache_set
+from groq_client import get_client  # Client Groq dùng chung cho AI phân tích
 
 # Cấu hình Flask app
 arbitrage_bp = Blueprint('arbitrage_bp', __name__)
 
-load_dotenv(dotenv_path=".env")
 # Groq API Key
-groq_client = Groq(
-    api_key=os.getenv("GROQ_API_KEY_2"),)
+groq_client = get_client("GROQ_API_KEY_2")
 
 # Danh sách các sàn giao dịch được hỗ trợ
-EXCHANGES = {
-    "binance": ccxt.binance(),
-    "kraken": ccxt.kraken(),
-    "coinbase": ccxt.coinbase(),
-    "bitfinex": ccxt.bitfinex(),
-    "bitmex": ccxt.bitmex(),
+EXCHANGE_CLASSES = {
+    "binance": ccxt.binance,
+    "kraken": ccxt.kraken,
+    "coinbase": ccxt.coinbase,
+    "bitfinex": ccxt.bitfinex,
+    "bitmex": ccxt.bitmex,
 }
 
+# Khởi tạo lười: client chỉ được tạo ở lần gọi đầu tiên rồi tái sử dụng,
+# tránh trả chi phí dựng 5 client ngay khi import module.
+_exchanges = {}
+
+def get_exchange(name):
+    """Trả về client ccxt cho sàn name, tạo một lần và cache lại."""
+    if name not in _exchanges:
+        # enableRateLimit: ccxt tự giãn cách request theo rate limit của
+        # từng sàn, tránh bị trả về 429 khi gọi liên tục. timeout chặn
+        # trường hợp một sàn treo giữ worker quá 10 giây.
+        _exchanges[name] = EXCHANGE_CLASSES[name]({"enableRateLimit": True, "timeout": 10000})
+    return _exchanges[name]
+
+def _fetch_ticker_price(exchange_name, symbol):
+    """Lấy giá mới nhất của symbol từ một sàn giao dịch."""
+    try:
+        ticker = get_exchange(exchange_name).fetch_ticker(symbol)
+        return ticker["last"]
+    except Exception as e:
+        print(f"Error fetching data from {exchange_name}: {e}")
+        return None
+
 def fetch_prices(symbol):
     """Lấy giá từ các sàn giao dịch."""
     prices = {}
-    for exchange_name, exchange in EXCHANGES.items():
-        try:
-            ticker = exchange.fetch_ticker(symbol)
-            prices[exchange_name] = ticker["last"]
-        except Exception as e:
-            print(f"Error fetching data from {exchange_name}: {e}")
+    # Mỗi sàn là một HTTP call độc lập nên chạy song song thay vì tuần tự.
+    with ThreadPoolExecutor(max_workers=len(EXCHANGE_CLASSES)) as executor:
+        futures = {
+            name: executor.submit(_fetch_ticker_price, name, symbol)
+            for name in EXCHANGE_CLASSES
+        }
+        for name, future in futures.items():
+            price = future.result()
+            if price is not None:
+                prices[name] = price
     return prices
 
 def analyze_arbitrage_with_groq(prices):
@@ -61,12 +85,20 @@ def analyze_arbitrage_with_groq(prices):
       }}
     }}
     """
+    # Giá giống nhau thì prompt giống nhau, tái sử dụng kết quả phân tích cũ.
+    cache_key = "llm:" + hashlib.sha256(prompt.encode()).hexdigest()
+    cached = cache_get(cache_key)
+    if cached:
+        return cached
     try:
         response = groq_client.chat.completions.create(
             messages=[{"role": "user", "content": prompt}],
             model="llama3-70b-8192"
         )
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        if content:
+            cache_set(cache_key, content, 300)
+        return content
     except Exception as e:
         print(f"Error using Groq AI: {e}")
         return "Unable to analyze arbitrage opportunities using Groq."
@@ -1,32 +1,47 @@
-import os
+import hashlib
+import json
 import re
-from dotenv import load_dotenv
-from flask import Blueprint, Flask, jsonify
-import requests
-from googleapiclient.discovery import build
-from groq import Groq
-from flask_cors import CORS
-
-load_dotenv(dotenv_path=".env")
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from cache import cache_get, cache_set
+from config import CSE_ID, GG_API_KEY
+from groq_client import get_client
+from http_session import get_json, session
 
 # Flask app
 btc_bp = Blueprint('btc_bp', __name__)
 
-# API keys
-gg_api_key = os.getenv("GG_API_KEY");
-cse_id = os.getenv("CSE_ID");
-client = Groq(
-    api_key=os.getenv("GROQ_API_KEY_1"),
+# Compiled once; re.search(pattern, ...) would recompile on every request
+FINAL_DECISION_RE = re.compile(
+    r'"final_decision":\s*{\s*"token_name":\s*"([^"]+)",\s*"decision":\s*(true|false)'
 )
 
+client = get_client("GROQ_API_KEY_1")
+
 def fetch_btc_info():
     """Fetch information about Bitcoin from CoinGecko API."""
+    cached = cache_get("coingecko:bitcoin")
+    if cached:
+        return cached
     url = "https://api.coingecko.com/api/v3/coins/bitcoin"
     try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return {
+        # Only market_data is read below; turning the other sections off
+        # shrinks the response from hundreds of KB to a few KB, so there is
+        # far less JSON to download and parse. get_json revalidates with the
+        # stored ETag so unchanged data costs a 304.
+        data = get_json(
+            url,
+            params={
+                "localization": "false",
+                "tickers": "false",
+                "market_data": "true",
+                "community_data": "false",
+                "developer_data": "false",
+                "sparkline": "false",
+            },
+        )
+        if data:
+            btc_data = {
                 "name": data["name"],
                 "symbol": data["symbol"],
                 "price": data["market_data"]["current_price"]["usd"],
@@ -34,25 +49,44 @@ def fetch_btc_info():
                 "market_cap": data["market_data"]["market_cap"]["usd"],
                 "price_change_24h": data["market_data"]["price_change_percentage_24h"],
             }
+            cache_set("coingecko:bitcoin", btc_data, 60)
+            return btc_data
     except Exception as e:
         print(f"Error fetching data for Bitcoin: {e}")
     return None
 
 def search_btc_trends():
     """Search for the latest trends related to Bitcoin using Google Custom Search API."""
-    service = build("customsearch", "v1", developerKey=gg_api_key)
+    cached = cache_get("cse:btc-trends")
+    if cached:
+        return cached
     try:
-        results = service.cse().list(q="Bitcoin cryptocurrency trends", cx=cse_id, num=5).execute()
-        return [
+        # Call the CSE REST endpoint directly; the discovery client rebuilt
+        # its service description on every request just to issue this GET.
+        response = session.get(
+            "https://www.googleapis.com/customsearch/v1",
+            params={"key": GG_API_KEY, "cx": CSE_ID, "q": "Bitcoin cryptocurrency trends", "num": 5},
+            timeout=10,
+        )
+        response.raise_for_status()
+        results = response.json()
+        trends = [
             {"title": item["title"], "link": item["link"], "snippet": item["snippet"]}
             for item in results.get("items", [])
         ]
+        if trends:
+            cache_set("cse:btc-trends", trends, 300)
+        return trends
     except Exception as e:
         print(f"Error fetching Bitcoin trends: {e}")
         return []
 
-def analyze_btc_market(btc_data, trends):
-    """Analyze Bitcoin data and trends to make a decision."""
+def analyze_btc_market(btc_data, trends, stream=False):
+    """Analyze Bitcoin data and trends to make a decision.
+
+    With stream=True, returns a generator of response-text chunks as the
+    model produces them instead of waiting for the full completion.
+    """
     prompt = f"""Analyze the following Bitcoin data and trends. Recommend whether to buy Bitcoin (BTC) at the current time.
     Bitcoin Data: {btc_data}
     Trends: {trends}
@@ -66,31 +100,72 @@ def analyze_btc_market(btc_data, trends):
       }}
     }}
     """
+    # Identical inputs (common while the upstream caches are warm) produce
+    # identical prompts, so reuse the previous completion instead of paying
+    # for a new one. Streaming responses are generated fresh.
+    cache_key = "llm:" + hashlib.sha256(prompt.encode()).hexdigest()
+    if not stream:
+        cached = cache_get(cache_key)
+        if cached:
+            return cached
     try:
         response = client.chat.completions.create(
             messages=[{"role": "user", "content": prompt}],
             model="llama3-70b-8192",
+            stream=stream,
         )
-        return response.choices[0].message.content
+        if stream:
+            return (chunk.choices[0].delta.content or "" for chunk in response)
+        content = response.choices[0].message.content
+        if content:
+            cache_set(cache_key, content, 300)
+        return content
     except Exception as e:
         print(f"Error analyzing Bitcoin market: {e}")
         return None
 
+def _parse_final_decision(analysis):
+    """Extract token_name and decision from the LLM output."""
+    text = analysis if analysis else ""
+    # The model is asked for JSON, so parse the outermost object properly
+    # instead of regex-matching it; fall back to the regex for sloppy output.
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            decision = json.loads(text[start:end + 1]).get("final_decision", {})
+            return str(decision.get("token_name", "None")), decision.get("decision") is True
+        except (ValueError, AttributeError):
+            pass
+    match = FINAL_DECISION_RE.search(text)
+    if match:
+        return match.group(1), match.group(2).lower() == 'true'
+    return "None", False
+
+
 @btc_bp.route('/', methods=['GET'],strict_slashes=False)
 def btc_analysis():
     """Endpoint to get Bitcoin market analysis and recommendation."""
-    btc_data = fetch_btc_info()
-    trends = search_btc_trends()
+    # Market data and trends are independent; fetch both at once. Only the
+    # LLM call has to wait for them.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        btc_future = executor.submit(fetch_btc_info)
+        trends_future = executor.submit(search_btc_trends)
+        btc_data = btc_future.result()
+        trends = trends_future.result()
+
+    # ?stream=true streams the raw analysis text as the model generates it,
+    # so the client sees output immediately instead of after the whole
+    # completion finishes.
+    if request.args.get("stream") in ("1", "true"):
+        chunks = analyze_btc_market(btc_data, trends, stream=True)
+        if chunks is not None:
+            return Response(stream_with_context(chunks), mimetype="text/plain")
+
     analysis = analyze_btc_market(btc_data, trends)
 
     # Extract decision from analysis if provided
-    match = re.search(r'"final_decision":\s*{\s*"token_name":\s*"([^"]+)",\s*"decision":\s*(true|false)', analysis if analysis else "")
-    if match:
-        token_name = match.group(1)
-        decision = match.group(2).lower() == 'true'
-    else:
-        token_name = "None"
-        decision = False
+    token_name, decision = _parse_final_decision(analysis)
 
     return jsonify({
         "analysis": analysis if analysis else "Không thể phân tích dữ liệu.",
@@ -0,0 +1,47 @@
+import json
+import os
+import time
+
+# Short-TTL cache for upstream API responses (CoinGecko, Google CSE).
+# Uses Redis when REDIS_URL points at a reachable server so the cache is
+# shared across workers; otherwise falls back to a per-process dict so
+# the app keeps working without extra infrastructure.
+try:
+    import redis
+    _redis = redis.Redis.from_url(
+        os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        decode_responses=True,
+        socket_timeout=2,
+    )
+    _redis.ping()
+except Exception as e:
+    print(f"Redis unavailable, using in-process cache: {e}")
+    _redis = None
+
+_local = {}
+
+
+def cache_get(key):
+    """Return the cached value for key, or None if missing/expired."""
+    try:
+        if _redis is not None:
+            value = _redis.get(key)
+            return json.loads(value) if value is not None else None
+        entry = _local.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        _local.pop(key, None)
+    except Exception as e:
+        print(f"Error reading cache for {key}: {e}")
+    return None
+
+
+def cache_set(key, value, ttl):
+    """Store value under key for ttl seconds."""
+    try:
+        if _redis is not None:
+            _redis.setex(key, ttl, json.dumps(value))
+        else:
+            _local[key] = (time.time() + ttl, value)
+    except Exception as e:
+        print(f"Error writing cache for {key}: {e}")
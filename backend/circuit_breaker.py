@@ -0,0 +1,39 @@
+import time
+
+
+class CircuitBreakerOpen(Exception):
+    """Raised when a breaker is open and the call is shed without trying."""
+
+
+class CircuitBreaker:
+    """Shed calls to an upstream that keeps failing.
+
+    After max_failures consecutive failures the breaker opens and calls
+    raise CircuitBreakerOpen immediately for cooldown seconds, so a stuck
+    dependency costs microseconds instead of tying a worker up in timeout
+    waits. After the cooldown one probe call is let through; success closes
+    the breaker again.
+    """
+
+    def __init__(self, name, max_failures=3, cooldown=30):
+        self.name = name
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def check(self):
+        """Raise CircuitBreakerOpen if calls should be shed right now."""
+        if self._failures >= self.max_failures:
+            if time.time() - self._opened_at < self.cooldown:
+                raise CircuitBreakerOpen(f"circuit for {self.name} is open")
+            # Cooldown over: half-open, allow a probe call through.
+            self._failures = self.max_failures - 1
+
+    def record_success(self):
+        self._failures = 0
+
+    def record_failure(self):
+        self._failures += 1
+        if self._failures >= self.max_failures:
+            self._opened_at = time.time()
@@ -0,0 +1,9 @@
+import os
+from dotenv import load_dotenv
+
+# Load .env once for the whole backend; every module used to call
+# load_dotenv itself and re-read the same variables.
+load_dotenv(dotenv_path=".env")
+
+GG_API_KEY = os.getenv("GG_API_KEY")
+CSE_ID = os.getenv("CSE_ID")
@@ -0,0 +1,19 @@
+import os
+from dotenv import load_dotenv
+from groq import Groq
+
+load_dotenv(dotenv_path=".env")
+
+# One Groq client per API key, shared by every module that uses that key.
+# Each client owns an httpx connection pool, so reusing the instance keeps
+# TLS connections to the Groq API warm across requests and blueprints.
+_clients = {}
+
+
+def get_client(key_env):
+    """Return the shared Groq client for the API key in env var key_env."""
+    if key_env not in _clients:
+        # Bounded timeout so a stalled completion can't hold a worker
+        # indefinitely; callers already treat failures as "no analysis".
+        _clients[key_env] = Groq(api_key=os.getenv(key_env), timeout=60.0)
+    return _clients[key_env]
@@ -0,0 +1,65 @@
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from circuit_breaker import CircuitBreaker
+
+# Shared HTTP session so every outbound call reuses pooled TCP/TLS
+# connections instead of opening a fresh one per request. The pool is
+# sized for the widest fan-out we do (5 concurrent CoinGecko fetches).
+#
+# GETs are retried with exponential backoff on 429/5xx (honouring
+# Retry-After), so a CoinGecko rate-limit burst degrades into a short
+# wait instead of a failed fetch that hammers the API again next request.
+session = requests.Session()
+_retry = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True,
+)
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=_retry)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# Last ETag and parsed body per URL, for conditional requests.
+_etag_cache = {}
+
+# One breaker per upstream host; an unresponsive API trips it and further
+# calls fail instantly (into the callers' existing error handling) instead
+# of each burning a full timeout.
+_breakers = {}
+
+
+def get_json(url, params=None, timeout=10):
+    """GET a JSON document, revalidating with If-None-Match when possible.
+
+    CoinGecko returns ETags, so once a URL has been fetched a 304 costs only
+    headers instead of re-downloading and re-parsing the body. Raises for
+    HTTP errors like Response.raise_for_status, and raises
+    CircuitBreakerOpen without calling out while the host's breaker is open.
+    """
+    host = urlsplit(url).netloc
+    breaker = _breakers.setdefault(host, CircuitBreaker(host))
+    breaker.check()
+    key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+    cached = _etag_cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    try:
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            breaker.record_success()
+            return cached[1]
+        response.raise_for_status()
+        data = response.json()
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    etag = response.headers.get("ETag")
+    if etag:
+        _etag_cache[key] = (etag, data)
+    return data
@@ -1,5 +1,7 @@
 from flask import Flask, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import orjson
 import os
 
 # Import các hàm từ các file khác
@@ -8,8 +10,19 @@ from btc import btc_bp
 from hodling import hodling_bp
 from arbitrage import arbitrage_bp
 
+class OrjsonProvider(JSONProvider):
+    """Serialize jsonify responses with orjson (C implementation) instead of
+    the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Khởi tạo Flask server
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 @app.route("/", methods=["GET"])